@@ -1,25 +1,76 @@
 import os
+from dataclasses import dataclass, fields
 
 from dotenv import load_dotenv
 
+from src.utils.exceptions import MissingVariableError
+from src.utils.logger import setup_logger
+
 load_dotenv()
 
-MEDIA_ROOT_PATH = os.getenv('media_root_path')
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Переменные окружения из .env, прочитанные один раз при импорте.
+
+    Raises:
+        MissingVariableError: Если хотя бы одна из переменных
+            не определена или пустая. Ошибка также пишется в лог.
+    """
+
+    media_root_path: str | None
+    telegram_bot_token: str | None
+    telegram_chat_id: str | None
+    x_api_key: str | None
+
+    def __post_init__(self):
+        missing_vars = tuple(
+            field.name for field in fields(self)
+            if not (getattr(self, field.name) or '').strip()
+        )
+        if missing_vars:
+            message = (f'В переменных окружения (.env) не определены: '
+                       f'{', '.join(missing_vars)}')
+            logger.critical(message)
+            raise MissingVariableError(message)
+
+
+SETTINGS = Settings(
+    media_root_path=os.environ.get('media_root_path'),
+    telegram_bot_token=os.environ.get('telegram_bot_token'),
+    telegram_chat_id=os.environ.get('telegram_chat_id'),
+    x_api_key=os.environ.get('x_api_key'),
+)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 MOVIES_FOLDER = 'Movies'
 CARTOONS_FOLDER = 'Cartoons'
 TV_SHOWS_FOLDER = 'Serials'
-TELEGRAM_BOT_TOKEN = os.getenv('telegram_bot_token')
-TELEGRAM_CHAT_ID = os.getenv('telegram_chat_id')
+ACTORS_FOLDER = '.actors'
 YEAR_STAMP = r'(19|20)\d{2}'
 VIDEO_EXT = ('.mp4', '.mkv', '.avi', '.mov')
+TELEGRAM_MESSAGE_LIMIT = 4096
+TELEGRAM_RETRIES = 3
+TELEGRAM_BACKOFF = 2
+# Сколько секунд ждать новых событий файловой системы, прежде чем
+# обработать накопившиеся файлы одной пачкой
+EVENTS_DEBOUNCE = 5
+# Через сколько секунд повторять обработку папок, завершившуюся ошибкой
+FAILED_RETRY_DELAY = 60*5
 
 ENDPOINT_SEARCH_BY_KEYWORDS = 'https://kinopoiskapiunofficial.tech/api/v2.1/films/search-by-keyword'
 ENDPOINT_DATA_BY_FILM_ID = 'https://kinopoiskapiunofficial.tech/api/v2.2/films'
 ENDPOINT_STAFF_BY_FILM_ID = 'https://kinopoiskapiunofficial.tech/api/v1/staff'
-X_API_KEY = os.getenv('x_api_key')
+REQUEST_TIMEOUT = (3.05, 10)
+DOWNLOAD_TIMEOUT = (3.05, 30)
 MAX_ACTORS = 10
-GET_ID_CACHE_SIZE = 100
 GET_ID_TTL = 60*60*24
+NOT_FOUND_TTL = 60*60*6
+HTTP_CACHE_TTL = 60*60*24*30
+CACHE_DB_PATH = os.path.join(BASE_DIR, 'cache.sqlite3')
 DAY_LIMIT = 500
 SECOND_LIMIT = 4
 FILM_INFO_STRUCTURE = {
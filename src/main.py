@@ -1,118 +1,258 @@
+import json
 import os
-import pprint
+import queue
 import re
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
-from xml.dom import minidom
-from xml.etree.ElementTree import Element, SubElement, tostring
-from cachetools.func import ttl_cache
-from datetime import datetime
+from xml.etree.ElementTree import Element, SubElement, indent, tostring
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 from telebot import TeleBot
 from telebot.apihelper import ApiTelegramException
+from urllib3.util.retry import Retry
+from watchdog.events import PatternMatchingEventHandler
+from watchdog.observers import Observer
 
 from config.settings import (
+    ACTORS_FOLDER,
+    CACHE_DB_PATH,
+    CARTOONS_FOLDER,
+    DAY_LIMIT,
+    DOWNLOAD_TIMEOUT,
     ENDPOINT_DATA_BY_FILM_ID,
     ENDPOINT_SEARCH_BY_KEYWORDS,
     ENDPOINT_STAFF_BY_FILM_ID,
+    EVENTS_DEBOUNCE,
+    FAILED_RETRY_DELAY,
     FILM_INFO_STRUCTURE,
+    GET_ID_TTL,
+    HTTP_CACHE_TTL,
     MAX_ACTORS,
-    MEDIA_ROOT_PATH,
-    TELEGRAM_BOT_TOKEN,
-    TELEGRAM_CHAT_ID,
+    MOVIES_FOLDER,
+    NOT_FOUND_TTL,
+    REQUEST_TIMEOUT,
+    SECOND_LIMIT,
+    SETTINGS,
+    TELEGRAM_BACKOFF,
+    TELEGRAM_MESSAGE_LIMIT,
+    TELEGRAM_RETRIES,
+    TV_SHOWS_FOLDER,
     VIDEO_EXT,
-    X_API_KEY,
     YEAR_STAMP,
-    GET_ID_CACHE_SIZE,
-    GET_ID_TTL,
-    DAY_LIMIT,
-    SECOND_LIMIT,
-    MOVIES_FOLDER,
-    CARTOONS_FOLDER,
-    TV_SHOWS_FOLDER
 )
 
+from .utils.cache import PersistentCache, negative_cache
 from .utils.exceptions import (
     APIAnswerWrongDataError,
     APIConnectionError,
-    MissingVariableError,
     NoFilmsError,
+    NotFoundError,
     NoYearError,
-    NotFoundError
+    RequestLimitExceededError,
+    TooManyRequestsError,
 )
+from .utils.files import atomic_write, fsync_dirs
 from .utils.logger import setup_logger
-from .utils.validators import validate_types, check_request_status
-
-_requests_per_day = 0
-_requests_per_second = 0
-_last_api_call_at: datetime
+from .utils.rate_limiter import TokenBucket, parse_retry_after, rate_limited
+from .utils.validators import check_request_status, typecheck, validate_types
 
 SPLITTERS = r'[_.()]'
 
+_YEAR_RE = re.compile(YEAR_STAMP)
+_SPLITTERS_RE = re.compile(SPLITTERS)
+_WS_RE = re.compile(r'\s+')
+
 
 logger_name = f'{__name__}'
 logger = setup_logger(logger_name)
-bot = TeleBot(token=TELEGRAM_BOT_TOKEN)
+bot = TeleBot(token=SETTINGS.telegram_bot_token)
+
+# Общая сессия: соединения переиспользуются между запросами.
+# Ключ API передается только в api_get, чтобы не отправлять его
+# сторонним хостам при загрузке изображений.
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3,
+                      backoff_factor=0.5,
+                      status_forcelist=[502, 503, 504],
+                      respect_retry_after_header=True,
+                      raise_on_status=False)
+))
+
+# Упреждающее ограничение частоты запросов к API
+SECOND_BUCKET = TokenBucket(capacity=SECOND_LIMIT, rate=SECOND_LIMIT)
+DAY_BUCKET = TokenBucket(capacity=DAY_LIMIT, rate=DAY_LIMIT / (60 * 60 * 24))
+
+# Ответы API сохраняются на диск и переживают перезапуск скрипта
+CACHE = PersistentCache(CACHE_DB_PATH)
+
+# Сообщения в Telegram отправляются фоновым потоком telegram_worker
+TELEGRAM_QUEUE: queue.Queue = queue.Queue()
+
+# Пул потоков для параллельных запросов к API и загрузки изображений
+EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# Временные сбои: только после них папка обрабатывается повторно,
+# остальные ошибки повторный запрос к API не исправит
+TRANSIENT_ERRORS = (APIConnectionError, TooManyRequestsError,
+                    RequestLimitExceededError)
 
 # Вспомогательные функции
 # =========================
 
 
-def check_vars():
-    """Проверяет, наличие переменных для работы скрипта.
+def split_message(message: str,
+                  limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[str]:
+    """Разбивает сообщение на части не длиннее лимита Telegram.
 
-    Raises:
-        MissingEnvironmentVariableError: Если хотя бы одна из переменных
-            не определена или пустая.
+    Разбиение идет по границам строк, слишком длинные строки режутся.
+
+    Args:
+        message: Исходное сообщение.
+        limit: Максимальная длина части.
+
+    Returns:
+        Список частей сообщения.
     """
-    variables = {
-        '.env': {
-            'MEDIA_ROOT_PATH': MEDIA_ROOT_PATH,
-            'TELEGRAM_BOT_TOKEN': TELEGRAM_BOT_TOKEN,
-            'TELEGRAM_CHAT_ID': TELEGRAM_CHAT_ID,
-            'X_API_KEY': X_API_KEY
-        },
-        'settings.py': {
-            'YEAR_STAMP': YEAR_STAMP,
-            'VIDEO_EXT': VIDEO_EXT,
-            'ENDPOINT_SEARCH_BY_KEYWORDS': ENDPOINT_SEARCH_BY_KEYWORDS,
-            'ENDPOINT_DATA_BY_FILM_ID': ENDPOINT_DATA_BY_FILM_ID,
-            'ENDPOINT_STAFF_BY_FILM_ID': ENDPOINT_STAFF_BY_FILM_ID
-        }
-    }
-    missing_vars = []
-    for file_name, vars_dict in variables.items():
-        for var_name, var_value in vars_dict.items():
-            if (var_value is None or
-                    (isinstance(var_value, str) and var_value.strip() == '')):
-                missing_vars.append(f'{file_name}: {var_name}')
-    if missing_vars:
-        error_message = (f'В переменных окружения не определены: '
-                         f'{', '.join(missing_vars)}')
-        logger.critical(error_message)
-        raise MissingVariableError(error_message)
+    chunks = []
+    lines = []
+    size = 0
+    for line in message.splitlines():
+        for start in range(0, max(len(line), 1), limit):
+            piece = line[start:start + limit]
+            if lines and size + 1 + len(piece) > limit:
+                chunks.append('\n'.join(lines))
+                lines = []
+                size = 0
+            size += len(piece) + (1 if lines else 0)
+            lines.append(piece)
+    if lines:
+        chunks.append('\n'.join(lines))
+    return chunks
+
+
+def send_message(message: str):
+    """Ставит сообщение в очередь на отправку в Telegram.
+
+    Не блокирует вызывающий поток: отправкой занимается telegram_worker.
 
+    Args:
+        message: Отправляемое сообщение.
+    """
+    TELEGRAM_QUEUE.put_nowait(message)
+
+
+def deliver_message(bot: TeleBot, message: str) -> bool:
+    """Отправляет пользователю сообщение в Telegram, повторяя попытки
+    с нарастающей паузой.
 
-def send_message(bot: TeleBot, message: str) -> bool:
-    """Отправляет пользователю сообщение в Telegram.
+    Длинное сообщение отправляется несколькими частями.
 
     Args:
         bot: Telegram-бот
         message: Отправляемое сообщение.
 
-    Raises:
-        MessageSendError: В случае ошибки при отправке.
+    Returns:
+        True, если все части сообщения отправлены.
     """
-    try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-    except (ApiTelegramException, RequestException):
-        return False
-    logger.debug('Сообщение успешно отправлено в Telegram.')
-    return True
+    is_sent = True
+    for chunk in split_message(message):
+        if not chunk.strip():
+            continue
+        for attempt in range(TELEGRAM_RETRIES):
+            try:
+                bot.send_message(SETTINGS.telegram_chat_id, chunk)
+                break
+            except (ApiTelegramException, RequestException) as e:
+                logger.warning(
+                    f'Ошибка при отправке сообщения в Telegram: {e}')
+                if attempt < TELEGRAM_RETRIES - 1:
+                    time.sleep(TELEGRAM_BACKOFF * 2 ** attempt)
+        else:
+            # Неотправленная часть не мешает отправить остальные
+            is_sent = False
+    if is_sent:
+        logger.debug('Сообщение успешно отправлено в Telegram.')
+    return is_sent
+
+
+def telegram_worker(bot: TeleBot):
+    """Отправляет сообщения из TELEGRAM_QUEUE в фоновом потоке.
+
+    Args:
+        bot: Telegram-бот
+    """
+    while True:
+        message = TELEGRAM_QUEUE.get()
+        try:
+            if not deliver_message(bot, message):
+                logger.error('Ошибка при отправке сообщения')
+        except Exception as e:
+            logger.error(f'Ошибка при отправке сообщения: {e}')
+        finally:
+            TELEGRAM_QUEUE.task_done()
+
 
+def api_get(request_params: dict) -> tuple[int, bytes]:
+    """Отправляет GET-запрос к API через общую сессию.
 
+    Если для запроса сохранены ETag или Last-Modified, запрос отправляется
+    условным, и при ответе 304 возвращается сохраненное тело ответа.
+    Если API ответил 429, приостанавливает выдачу токенов
+    на время из заголовка Retry-After.
+
+    Args:
+        request_params: Параметры запроса (url, params).
+
+    Raises:
+        APIConnectionError: Если ответ от API не получен.
+
+    Returns:
+        Кортеж - (статус-код, тело ответа)
+    """
+    cache_key = json.dumps(
+        [request_params['url'], request_params.get('params')],
+        ensure_ascii=False)
+    stored = CACHE.get_response(cache_key)
+    headers = {'x-api-key': SETTINGS.x_api_key}
+    if stored is not None:
+        etag, last_modified, _ = stored
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    try:
+        response = SESSION.get(**request_params, headers=headers,
+                               timeout=REQUEST_TIMEOUT)
+    except RequestException as e:
+        message = (f'Ошибка при получении ответа от API {request_params}: {e}')
+        raise APIConnectionError(message)
+    status_code = response.status_code
+    if status_code == HTTPStatus.NOT_MODIFIED and stored is not None:
+        return HTTPStatus.OK, stored[2]
+    if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        SECOND_BUCKET.pause(
+            parse_retry_after(response.headers.get('Retry-After')))
+    if status_code == HTTPStatus.OK:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            CACHE.set_response(cache_key, etag, last_modified,
+                               response.content, HTTP_CACHE_TTL)
+        elif stored is not None:
+            CACHE.delete_response(cache_key)
+    return status_code, response.content
+
+
+@typecheck
 def get_film_name_year(
         raw_file_name: str, is_tv_show: bool = False) -> tuple[str, str | None]:
     """Возвращает название и год выпуска из имени файла.
@@ -127,9 +267,8 @@ def get_film_name_year(
     Returns:
         Кортеж - (title, year | None)
     """
-    validate_types(raw_file_name=(raw_file_name, str))
     if not is_tv_show:
-        match = re.search(YEAR_STAMP, raw_file_name)
+        match = _YEAR_RE.search(raw_file_name)
         if match:
             year = match.group()
             raw_title = raw_file_name[:match.start()]
@@ -140,30 +279,32 @@ def get_film_name_year(
     else:
         raw_title = raw_file_name
         year = None
-    title = re.sub(SPLITTERS, ' ', raw_title)
-    title = re.sub(r'\s+', ' ', title).strip()
+    title = _SPLITTERS_RE.sub(' ', raw_title)
+    title = _WS_RE.sub(' ', title).strip()
     return title, year
 
 
-def is_nfo_file_exists(video_file_name: str, files: list) -> bool:
+@typecheck
+def is_nfo_file_exists(video_file_name: str, files: frozenset) -> bool:
     """Проверяет наличие *.nfo файла рядом с фильмом.
 
     Args:
         video_file_name: Имя файла фильма без расширения.
-        files: Список файлов в папке с фильмом.
+        files: Множество имен файлов в папке с фильмом.
 
     Returns:
         True | False
     """
-    validate_types(video_file_name=(video_file_name, str))
-
     nfo_file_name = video_file_name + '.nfo'
     if nfo_file_name in files:
         return True
     return False
 
 
-@ttl_cache(maxsize=GET_ID_CACHE_SIZE, ttl=GET_ID_TTL)
+@typecheck
+@negative_cache(expire=NOT_FOUND_TTL, exceptions=(NoFilmsError,))
+@CACHE.memoize(expire=GET_ID_TTL)
+@rate_limited(SECOND_BUCKET, DAY_BUCKET)
 def get_film_id(
         title: str, year: str | None = None) -> tuple[bool, str, str] | None:
     """Отправляет запрос к kinopoiskapiunofficial API для поиска
@@ -188,27 +329,15 @@ def get_film_id(
         kinopoisk_id - id для поиска информации по фильму.
         msg - сообщение с результатом работы, для дальнейшего логгирования.
     """
-    last_release_year = '0000'
-    last_released_film_idx = 0
-    is_year_found = False
     request_params = {'url': ENDPOINT_SEARCH_BY_KEYWORDS,
-                      'headers': {'x-api-key': X_API_KEY},
                       'params': {'keyword': title}}
 
-    validate_types(title=(title, str))
-    if year:
-        validate_types(year=(year, str))
-    try:
-        request_films = requests.get(**request_params)
-    except RequestException as e:
-        message = (f'Ошибка при получении ответа от API {request_params}: {e}')
-        raise APIConnectionError(message)
-    status_code = request_films.status_code
+    status_code, content = api_get(request_params)
     check_request_status(status_code)
     if status_code == HTTPStatus.NOT_FOUND:
         return None
 
-    request_data = request_films.json()
+    request_data = orjson.loads(content)
     validate_types(request_data=(request_data, dict))
     if 'films' not in request_data:
         msg = 'Ключ films отсутствует в ответе API'
@@ -220,28 +349,29 @@ def get_film_id(
                f'Проверьте имя файла.')
         raise NoFilmsError(msg)
 
-    for idx, film in enumerate(films):
+    latest_film = films[0]
+    for film in films:
         film_year: str = film['year']
         if len(film_year) != 4 or not film_year.isdigit():
             msg = 'В ответе формат данных года не соответствует ожидаемым'
             raise APIAnswerWrongDataError(msg)
-        if film_year > last_release_year:
-            last_release_year = film_year
-            last_released_film_idx = idx
-        if not is_year_found:
-            if film_year == year:
-                is_year_found = True
-                msg = (f'Данные о фильме {film['nameRu']} ({year}) '
-                       f'успешно получены')
-                return is_year_found, str(films[idx]['filmId']), msg
-
-        msg = (f'Год выпуска при поиске {title} ({year}) '
-               f'не найден в ответе API, сохранены данные о фильме '
-               f'с самым свежим годом релиза.')
-    return is_year_found, str(films[last_released_film_idx]['filmId']), msg
-
-
-@ttl_cache(maxsize=GET_ID_CACHE_SIZE, ttl=GET_ID_TTL)
+        if film_year == year:
+            msg = (f'Данные о фильме {film['nameRu']} ({year}) '
+                   f'успешно получены')
+            return True, str(film['filmId']), msg
+        if film_year > latest_film['year']:
+            latest_film = film
+
+    msg = (f'Год выпуска при поиске {title} ({year}) '
+           f'не найден в ответе API, сохранены данные о фильме '
+           f'с самым свежим годом релиза.')
+    return False, str(latest_film['filmId']), msg
+
+
+@typecheck
+@negative_cache(expire=NOT_FOUND_TTL)
+@CACHE.memoize(expire=GET_ID_TTL)
+@rate_limited(SECOND_BUCKET, DAY_BUCKET)
 def get_raw_film_info(film_id: str) -> dict | None:
     """Отправляет запрос к kinopoiskapiunofficial API для поиска
       информации о фильме по kinopoisk_id.
@@ -257,28 +387,23 @@ def get_raw_film_info(film_id: str) -> dict | None:
     Returns:
         raw_film_info - сырая информация о фильме.
     """
-    validate_types(film_id=(film_id, str))
-
     url = f'{ENDPOINT_DATA_BY_FILM_ID}/{film_id}'
-    request_params = {'url': url,
-                      'headers': {'x-api-key': X_API_KEY}}
+    request_params = {'url': url}
 
-    try:
-        request_film_info = requests.get(**request_params)
-    except RequestException as e:
-        message = (f'Ошибка при получении ответа от API {request_params}: {e}')
-        raise APIConnectionError(message)
-    status_code = request_film_info.status_code
+    status_code, content = api_get(request_params)
     check_request_status(status_code)
     if status_code == HTTPStatus.NOT_FOUND:
         return None
-    raw_film_info = request_film_info.json()
+    raw_film_info = orjson.loads(content)
 
     validate_types(raw_film_info=(raw_film_info, dict))
     return raw_film_info
 
 
-@ttl_cache(maxsize=GET_ID_CACHE_SIZE, ttl=GET_ID_TTL)
+@typecheck
+@negative_cache(expire=NOT_FOUND_TTL)
+@CACHE.memoize(expire=GET_ID_TTL)
+@rate_limited(SECOND_BUCKET, DAY_BUCKET)
 def get_raw_staff_info(
         film_id: str, max_actors: int = MAX_ACTORS) -> dict | None:
     """Отправляет запрос к kinopoiskapiunofficial API для поиска
@@ -295,24 +420,16 @@ def get_raw_staff_info(
     Returns:
         _description_
     """
-    validate_types(film_id=(film_id, str))
-
     raw_filtered_staff: dict = {'ACTORS': [],
                                 'DIRECTORS': []}
-    url = f'{ENDPOINT_STAFF_BY_FILM_ID}?filmId={film_id}'
-    request_params = {'url': url,
-                      'headers': {'x-api-key': X_API_KEY}}
-    try:
-        request_staff_info = requests.get(**request_params)
-    except RequestException as e:
-        message = (f'Ошибка при получении ответа от API {request_params}: {e}')
-        raise APIConnectionError(message)
-    status_code = request_staff_info.status_code
+    request_params = {'url': ENDPOINT_STAFF_BY_FILM_ID,
+                      'params': {'filmId': film_id}}
+    status_code, content = api_get(request_params)
     check_request_status(status_code)
     if status_code == HTTPStatus.NOT_FOUND:
         return None
 
-    raw_film_staff_info = request_staff_info.json()
+    raw_film_staff_info = orjson.loads(content)
 
     validate_types(raw_film_staff_info=(raw_film_staff_info, list))
 
@@ -325,6 +442,48 @@ def get_raw_staff_info(
     return raw_filtered_staff
 
 
+def is_empty_value(value) -> bool:
+    """Проверяет, отсутствует ли значение поля.
+
+    Пустыми считаются None, пустая строка и пустой список,
+    числовой 0 (например, 0 голосов) - допустимое значение.
+    """
+    return value is None or (isinstance(value, (str, list)) and not value)
+
+
+def _as_runtime(key: str, value, clean_film_info: dict,
+                posters_urls: dict, empty_fields: list):
+    """Переводит продолжительность фильма из минут в секунды."""
+    try:
+        runtime = int(value) * 60
+    except (TypeError, ValueError):
+        runtime = None
+    clean_film_info[key] = runtime or None
+    if not runtime:
+        empty_fields.append(key)
+
+
+def _as_poster_url(key: str, value, clean_film_info: dict,
+                   posters_urls: dict, empty_fields: list):
+    """Сохраняет ссылку на изображение для последующей загрузки."""
+    posters_urls[key] = value
+
+
+def _as_value(key: str, value, clean_film_info: dict,
+              posters_urls: dict, empty_fields: list):
+    """Сохраняет значение поля без изменений."""
+    clean_film_info[key] = value
+
+
+# Обработчики полей FILM_INFO_STRUCTURE, по умолчанию - _as_value
+_CLEAN_HANDLERS = {
+    'runtime': _as_runtime,
+    'poster': _as_poster_url,
+    'fanart': _as_poster_url,
+}
+
+
+@typecheck
 def get_clean_film_info(raw_film_info: dict) -> tuple[dict, dict, str]:
     """Подготавливает словарь для последующего сохранения данных в *.nfo файл.
 
@@ -340,31 +499,22 @@ def get_clean_film_info(raw_film_info: dict) -> tuple[dict, dict, str]:
         empty_fields_str - Строка с перечислением полей,
                            которые отсутствовали в исходных данных.
     """
-    validate_types(raw_film_info=(raw_film_info, dict))
-
     empty_fields = []
     clean_film_info = {}
     posters_urls = {'poster': None,
-                    'cover': None}       
+                    'cover': None}
     for key, api_field in FILM_INFO_STRUCTURE.items():
         value = raw_film_info.get(api_field)
-        if value:
-            if key == 'runtime':
-                try:
-                    clean_film_info[key] = int(value) * 60
-                except (TypeError, ValueError):
-                    clean_film_info[key] = None
-                    empty_fields.append(key)
-            elif key in ('poster', 'fanart'):
-                posters_urls[key] = value
-            else:
-                clean_film_info[key] = value
-        else:
+        if is_empty_value(value):
             empty_fields.append(key)
+            continue
+        handler = _CLEAN_HANDLERS.get(key, _as_value)
+        handler(key, value, clean_film_info, posters_urls, empty_fields)
     empty_fields_str = ', '.join(empty_fields)
     return clean_film_info, posters_urls, empty_fields_str
 
 
+@typecheck
 def get_clean_staff_info(raw_staff_info: dict) -> tuple[dict, dict, str]:
     """Подготавливает словари для последующего сохранения данных в *.nfo файл
     и загрузки фото актеров.
@@ -380,10 +530,6 @@ def get_clean_staff_info(raw_staff_info: dict) -> tuple[dict, dict, str]:
         staff_posters - Словарь со ссылками на фото участников.
         empty_posters - Участники у которых ссылка на фото отсутствовала.
     """
-    if raw_staff_info is None or not isinstance(raw_staff_info, dict):
-        msg = f'Для film_id ожидался dict, получен {type(raw_staff_info)}'
-        raise TypeError(msg)
-
     person: dict
     person_name = None
     clean_staff_info: dict = {'ACTORS': [],
@@ -436,7 +582,7 @@ def create_nfo(clean_film_info: dict, clean_staff_info: dict,
         nfo_path = os.path.join(path, raw_file_name + '.nfo')
         root = Element('movie')
         for tag, tag_value in clean_film_info.items():
-            if tag_value:
+            if not is_empty_value(tag_value):
                 if tag == 'genres':
                     for genre in tag_value:
                         SubElement(root, 'genre').text = str(genre['genre'])
@@ -456,15 +602,9 @@ def create_nfo(clean_film_info: dict, clean_staff_info: dict,
             elif profession == 'DIRECTORS':
                 for idx, person in enumerate(persons):
                     SubElement(root, 'director').text = person.get('name')
-        # ------------------
-        rough_xml = tostring(root, encoding='unicode', xml_declaration=True)
-        reparsed_xml = minidom.parseString(rough_xml)
-        pretty_xml = reparsed_xml.toprettyxml(indent='  ', encoding='utf-8')
-        # Убираем лишние пустые строки от toprettyxml
-        lines = [line for line in pretty_xml.decode('utf-8').splitlines() if line.strip()]
-        final_xml = '\n'.join(lines)
-        # -------------------
-        with open(nfo_path, 'w', encoding='utf-8') as f:
+        indent(root, space='  ')
+        final_xml = tostring(root, encoding='unicode', xml_declaration=True)
+        with atomic_write(nfo_path, 'w', encoding='utf-8') as f:
             f.write(final_xml)
         return True, '*.nfo файл успешно создан.'
     except Exception as e:
@@ -472,6 +612,20 @@ def create_nfo(clean_film_info: dict, clean_staff_info: dict,
         return False, str(error_msg)
 
 
+def _download(url: str, path: str):
+    """Загружает файл по ссылке и сохраняет его по указанному пути.
+
+    Args:
+        url: Ссылка на файл.
+        path: Путь сохранения.
+    """
+    with SESSION.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        with atomic_write(path, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, length=64 * 1024)
+
+
 def create_posters(posters_urls: dict, staff_posters: dict,
                    root: str, raw_file_name: str) -> tuple[bool, str]:
     """Сохраняет постеры и фото актеров.
@@ -488,79 +642,238 @@ def create_posters(posters_urls: dict, staff_posters: dict,
                        root=(root, str),
                        raw_file_name=(raw_file_name, str))
 
+        downloads = []
         for key, value in posters_urls.items():
             if value:
                 file_root = os.path.join(root, f'{raw_file_name}-{key}.jpg')
-                picture = requests.get(url=posters_urls[key])
-                with open(file_root, 'wb') as f:
-                    f.write(picture.content)
+                downloads.append((value, file_root))
 
-        for name, poster_url in staff_posters.items():
-            name = re.sub(' ', '_', name)
-            actors_dir = os.path.join(root, '.actors')
+        actors_dir = os.path.join(root, ACTORS_FOLDER)
+        if staff_posters:
             os.makedirs(actors_dir, exist_ok=True)
+        for name, poster_url in staff_posters.items():
+            name = name.replace(' ', '_')
             poster_root = os.path.join(actors_dir, f"{name}.jpg")
-            poster = requests.get(url=poster_url)
-            with open(poster_root, 'wb') as f:
-                f.write(poster.content)
+            downloads.append((poster_url, poster_root))
+
+        futures = {EXECUTOR.submit(_download, url, path): path
+                   for url, path in downloads}
+        failed = []
+        for future, path in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                failed.append(f'{os.path.basename(path)}: {e}')
+        if failed:
+            return False, (f'Не удалось сохранить постеры '
+                           f'({len(failed)} из {len(futures)}): '
+                           f'{'; '.join(failed)}')
         return True, 'Постеры успешно сохранены.'
     except Exception as e:
         error_msg = f'Ошибка при сохранении постеров: {e}'
         return False, str(error_msg)
 
 
-def process_folder(root: str, files: list):
+def process_film(root: str, raw_file_name: str) -> list[str]:
+    """Получает данные о фильме из API и сохраняет *.nfo и изображения.
+
+    Args:
+        root: Путь к папке с фильмом.
+        raw_file_name: Имя файла фильма без расширения.
+
+    Raises:
+        NotFoundError: Фильм или информация о нем в API не найдены.
+
+    Returns:
+        Строки сообщения с результатами обработки.
+    """
+    message_parts = []
+    title, year = get_film_name_year(raw_file_name)
+    result_film_id = get_film_id(title, year)
+    if result_film_id is None:
+        raise NotFoundError(f'В API для {title} ({year}) id не найден.\n'
+                            f'Проверьте имя файла.')
+    is_ok_film_id, film_id, msg_id = result_film_id
+    film_info_future = EXECUTOR.submit(get_raw_film_info, film_id)
+    staff_info_future = EXECUTOR.submit(
+        get_raw_staff_info, film_id, MAX_ACTORS)
+    result_raw_film_info = film_info_future.result()
+    result_raw_staff_info = staff_info_future.result()
+    if result_raw_film_info is None:
+        raise NotFoundError(f'В API для id {film_id} '
+                            f'информация о фильме не найдена')
+    raw_film_info = result_raw_film_info
+    if result_raw_staff_info is None:
+        raise NotFoundError(f'В API для id {film_id} '
+                            f'информация об актерах не найдена')
+    (clean_film_info, posters_urls,
+     empty_fields) = get_clean_film_info(raw_film_info)
+    message_parts.append(f'**** {clean_film_info['title']} '
+                         f'({clean_film_info['year']}):')
+
+    (clean_staff_info, staff_posters,
+     empty_posters) = get_clean_staff_info(result_raw_staff_info)
+
+    is_ok, msg = create_nfo(
+        clean_film_info, clean_staff_info, root, raw_file_name)
+    if is_ok:
+        logger.info(f'{title} ({year}): {msg}')
+    else:
+        logger.warning(f'{title} ({year}): {msg}')
+    message_parts.append(f'- {msg}')
+
+    is_ok, msg = create_posters(
+        posters_urls, staff_posters, root, raw_file_name)
+    if is_ok:
+        logger.info(f'{title} ({year}): {msg}')
+    else:
+        logger.warning(f'{title} ({year}): {msg}')
+    message_parts.append(f'- {msg}')
+
+    if not is_ok_film_id:
+        logger.warning(msg_id)
+        message_parts.append(f'- {msg_id}')
+    message_parts.append('')
+    return message_parts
+
+
+def process_folder(root: str,
+                   files: list) -> tuple[int, list[str], list[str], bool]:
+    """Обрабатывает фильмы в папке, у которых еще нет *.nfo файла.
+
+    Ошибка при обработке одного файла не прерывает обработку остальных.
+
+    Args:
+        root: Путь к папке.
+        files: Список файлов в папке.
+
+    Returns:
+        files_processed - Количество обработанных фильмов.
+        message_parts - Строки сообщения с результатами обработки.
+        errors - Описания ошибок по файлам.
+        is_retry_needed - Был ли среди ошибок временный сбой.
+    """
     files_processed = 0
-    message = ''
+    message_parts = []
+    errors = []
+    is_retry_needed = False
+    file_set = frozenset(files)
     for file in files:
         raw_file_name, ext = os.path.splitext(file)
+        if (ext not in VIDEO_EXT
+                or is_nfo_file_exists(raw_file_name, file_set)):
+            continue
+        try:
+            film_parts = process_film(root, raw_file_name)
+        except Exception as error:
+            logger.error(f'{os.path.join(root, file)}: {error}')
+            errors.append(f'{file}: {error}')
+            if isinstance(error, TRANSIENT_ERRORS):
+                is_retry_needed = True
+            continue
+        files_processed += 1
+        message_parts.extend(film_parts)
+    if files_processed:
+        # Переименования файлов фиксируются одним fsync на каталог
+        fsync_dirs((root, os.path.join(root, ACTORS_FOLDER)))
+    return files_processed, message_parts, errors, is_retry_needed
 
-        if ext in VIDEO_EXT:
-            if not is_nfo_file_exists(raw_file_name, files):
-                files_processed += 1
-                title, year = get_film_name_year(raw_file_name)
-                result_film_id = get_film_id(title, year)
-                if result_film_id is None:
-                    raise NotFoundError(f'В API для {title} ({year}) '
-                                        f'id не найден')
-                is_ok_film_id, film_id, msg_id = result_film_id
-                result_raw_film_info = get_raw_film_info(film_id)
-                if result_raw_film_info is None:
-                    raise NotFoundError(f'В API для id {film_id}) '
-                                        f'Информация о фильме не найдена')
-                raw_film_info = result_raw_film_info
-                result_raw_staff_info = get_raw_staff_info(film_id, MAX_ACTORS)
-                if result_raw_staff_info is None:
-                    raise NotFoundError(f'В API для id {film_id}) '
-                                        f'Информация об актерах не найдена')
-                (clean_film_info, posters_urls,
-                 empty_fields) = get_clean_film_info(raw_film_info)
-                message += (f'{clean_film_info['title']} '
-                            f'({clean_film_info['year']}):')
-
-                (clean_staff_info, staff_posters,
-                 empty_posters) = get_clean_staff_info(result_raw_staff_info)
-
-                is_ok, msg = create_nfo(
-                    clean_film_info, clean_staff_info, root, raw_file_name)
-                if is_ok:
-                    logger.info(f'{title} ({year}): {msg}')
-                else:
-                    logger.warning(f'{title} ({year}): {msg}')
-                message += f'\n- {msg}'
 
-                is_ok, msg = create_posters(
-                    posters_urls, staff_posters, root, raw_file_name)
-                if is_ok:
-                    logger.info(f'{title} ({year}): {msg}')
-                else:
-                    logger.warning(f'{title} ({year}): {msg}')
-                message += f'\n- {msg}'
+class NewVideoHandler(PatternMatchingEventHandler):
+    """Складывает в очередь пути новых видеофайлов медиатеки."""
+
+    def __init__(self, events: queue.Queue):
+        super().__init__(patterns=[f'*{ext}' for ext in VIDEO_EXT],
+                         ignore_directories=True)
+        self.events = events
+
+    def on_created(self, event):
+        self.events.put(event.src_path)
+
+    def on_moved(self, event):
+        self.events.put(event.dest_path)
+
+
+def walk_library(media_root: str):
+    """Обходит всю медиатеку, пропуская папку с сериалами.
+
+    Args:
+        media_root: Путь к корневой папке медиатеки.
+
+    Yields:
+        Кортеж - (путь к папке, список файлов в ней)
+    """
+    for root, dirs, files in os.walk(media_root):
+        if TV_SHOWS_FOLDER in dirs:
+            dirs.remove(TV_SHOWS_FOLDER)
+        yield root, files
+
+
+def wait_for_new_files(events: queue.Queue, media_root: str,
+                       failed_roots: list) -> list:
+    """Ждет появления новых видеофайлов и возвращает папки для обработки.
+
+    События, пришедшие с паузой меньше EVENTS_DEBOUNCE секунд,
+    обрабатываются одной пачкой (например, при копировании сразу
+    нескольких фильмов). Папки, обработка которых прервана временным
+    сбоем, возвращаются повторно не позже чем через FAILED_RETRY_DELAY секунд.
+
+    Args:
+        events: Очередь путей от NewVideoHandler.
+        media_root: Путь к корневой папке медиатеки.
+        failed_roots: Папки для повторной обработки.
+
+    Returns:
+        Список кортежей - (путь к папке, список файлов в ней)
+    """
+    paths = set()
+    try:
+        paths.add(events.get(
+            timeout=FAILED_RETRY_DELAY if failed_roots else None))
+        while True:
+            paths.add(events.get(timeout=EVENTS_DEBOUNCE))
+    except queue.Empty:
+        pass
+    folders = []
+    roots = {os.path.dirname(path) for path in paths}.union(failed_roots)
+    for root in roots:
+        relative_parts = os.path.relpath(root, media_root).split(os.sep)
+        if TV_SHOWS_FOLDER in relative_parts:
+            continue
+        try:
+            folders.append((root, os.listdir(root)))
+        except OSError as error:
+            logger.warning(f'Папка {root} недоступна: {error}')
+    return folders
+
+
+def process_folders(folders) -> tuple[int, list[str], list[str], list[str]]:
+    """Обрабатывает папки и собирает строки итогового сообщения для Telegram.
 
-                if not is_ok_film_id:
-                    logger.warning(msg_id) 
-                    message += f'\n- {msg_id}'
-    return files_processed, message
+    Args:
+        folders: Кортежи - (путь к папке, список файлов в ней).
+
+    Returns:
+        new_files - Количество обработанных фильмов.
+        message_parts - Строки сообщения с результатами обработки.
+        failed_roots - Папки, обработка которых прервана временным сбоем.
+        errors - Описания ошибок.
+    """
+    new_files = 0
+    message_parts = []
+    failed_roots = []
+    errors = []
+    for root, files in folders:
+        (files_processed, folder_parts,
+         folder_errors, is_retry_needed) = process_folder(root, files)
+        message_parts.extend(folder_parts)
+        new_files += files_processed
+        errors.extend(folder_errors)
+        if is_retry_needed:
+            failed_roots.append(root)
+    if new_files > 0:
+        message_parts.append(f'*!* Новых фильмов в медиатеке - {new_files}.')
+    return new_files, message_parts, failed_roots, errors
 
 
 # =========================
@@ -568,37 +881,51 @@ def process_folder(root: str, files: list):
 
 def main():
     latest_error_msg = ''
-    new_files = 0
-    while True:
-        new_files = 0
-        bot_message = ''
+    media_root = SETTINGS.media_root_path
+    threading.Thread(target=telegram_worker, args=(bot,), daemon=True).start()
 
+    # Наблюдатель запускается до полного обхода, чтобы не пропустить
+    # файлы, появившиеся во время него
+    events = queue.Queue()
+    observer = Observer()
+    try:
+        observer.schedule(NewVideoHandler(events), media_root, recursive=True)
+        observer.start()
+    except Exception as error:
+        error_message = f'Сбой в работе программы:\n{error}'
+        logger.critical(error_message)
+        send_message(error_message)
+        TELEGRAM_QUEUE.join()
+        raise
+
+    folders = walk_library(media_root)
+    while True:
+        is_walk_failed = False
         try:
-            check_vars()
-            for root, dirs, files in os.walk(MEDIA_ROOT_PATH):
-                if TV_SHOWS_FOLDER in dirs:
-                    dirs.remove(TV_SHOWS_FOLDER)
-                files_processed, message = process_folder(root, files)
-                if message:
-                    bot_message += f'**** {message}\n\n'
-                new_files += files_processed
-            # ----------------------
- 
-            # ----------------------
-            if new_files > 0:
-                bot_message += f'*!* Новых фильмов в медиатеке - {new_files}.'
-                send_message(bot, bot_message)
-            else:
-                print('Новых файлов нет')
+            (new_files, message_parts,
+             failed_roots, errors) = process_folders(folders)
         except Exception as error:
-            error_message = f'Сбой в работе программы:\n{error}'
+            # Сбой вне обработки отдельных файлов (например, при обходе
+            # папок) - медиатека будет обойдена заново целиком
+            logger.error(f'Ошибка при обходе медиатеки: {error}')
+            is_walk_failed = True
+            new_files, message_parts, failed_roots = 0, [], []
+            errors = [str(error)]
+        if new_files > 0:
+            send_message('\n'.join(message_parts))
+        elif not errors:
+            print('Новых файлов нет')
+        if errors:
+            error_message = ('Сбой в работе программы:\n'
+                             + '\n'.join(errors))
             if error_message != latest_error_msg:
-                try:
-                    send_message(bot, error_message)
-                    latest_error_msg = error_message
-                except Exception:
-                    logger.error('Ошибка при отправке сообщения')
-        time.sleep(10)
+                send_message(error_message)
+                latest_error_msg = error_message
+        if is_walk_failed:
+            time.sleep(FAILED_RETRY_DELAY)
+            folders = walk_library(media_root)
+        else:
+            folders = wait_for_new_files(events, media_root, failed_roots)
 
 
 if __name__ == '__main__':
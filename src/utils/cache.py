@@ -0,0 +1,183 @@
+import json
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+# Ключ - (имя функции, аргументы),
+# значение - (время истечения записи, запомненное исключение | None)
+NEG_CACHE: dict[tuple, tuple[float, Exception | None]] = {}
+
+
+class PersistentCache:
+    """Кэш результатов функций в SQLite, переживающий перезапуск скрипта.
+
+    Args:
+        path: Путь к файлу базы данных.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, '
+                'value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL)')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS cache_expires_at '
+                'ON cache (expires_at)')
+            self._conn.execute('DELETE FROM cache WHERE expires_at <= ?',
+                               (time.time(),))
+            # Таблица старого формата (без expires_at) пересоздается,
+            # её содержимое можно безопасно потерять
+            columns = {row[1] for row in self._conn.execute(
+                'PRAGMA table_info(http_cache)')}
+            if columns and 'expires_at' not in columns:
+                self._conn.execute('DROP TABLE http_cache')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS http_cache ('
+                'key TEXT PRIMARY KEY, '
+                'etag TEXT, '
+                'last_modified TEXT, '
+                'body BLOB NOT NULL, '
+                'expires_at REAL NOT NULL)')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS http_cache_expires_at '
+                'ON http_cache (expires_at)')
+            self._conn.execute(
+                'DELETE FROM http_cache WHERE expires_at <= ?',
+                (time.time(),))
+
+    def get(self, key: str) -> tuple[bool, object]:
+        """Возвращает значение из кэша.
+
+        Args:
+            key: Ключ записи.
+
+        Returns:
+            Кортеж - (найдено ли актуальное значение, значение | None)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM cache WHERE key = ? AND expires_at > ?',
+                (key, time.time())).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def set(self, key: str, value, expire: float):
+        """Сохраняет значение в кэш.
+
+        Args:
+            key: Ключ записи.
+            value: Значение, сериализуемое в JSON.
+            expire: Время жизни записи в секундах.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at) '
+                'VALUES (?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False),
+                 time.time() + expire))
+
+    def get_response(self, key: str) -> tuple[str | None, str | None,
+                                              bytes] | None:
+        """Возвращает сохраненный ответ API для условного запроса.
+
+        Args:
+            key: Ключ запроса.
+
+        Returns:
+            Кортеж - (ETag, Last-Modified, тело ответа) | None
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT etag, last_modified, body FROM http_cache '
+                'WHERE key = ? AND expires_at > ?',
+                (key, time.time())).fetchone()
+
+    def set_response(self, key: str, etag: str | None,
+                     last_modified: str | None, body: bytes, expire: float):
+        """Сохраняет ответ API вместе с заголовками ETag и Last-Modified.
+
+        Args:
+            key: Ключ запроса.
+            etag: Значение заголовка ETag.
+            last_modified: Значение заголовка Last-Modified.
+            body: Тело ответа.
+            expire: Время хранения записи в секундах.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO http_cache '
+                '(key, etag, last_modified, body, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, etag, last_modified, body, time.time() + expire))
+
+    def delete_response(self, key: str):
+        """Удаляет сохраненный ответ API.
+
+        Args:
+            key: Ключ запроса.
+        """
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM http_cache WHERE key = ?', (key,))
+
+    def memoize(self, expire: float):
+        """Декоратор: кэширует результат функции по её имени и аргументам.
+
+        Исключения и пустой результат (None) не кэшируются,
+        для последнего предназначен negative_cache.
+
+        Args:
+            expire: Время жизни записи в секундах.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = json.dumps([func.__name__, args, sorted(kwargs.items())],
+                                 ensure_ascii=False)
+                is_found, value = self.get(key)
+                if is_found:
+                    return value
+                value = func(*args, **kwargs)
+                if value is not None:
+                    self.set(key, value, expire)
+                return value
+            return wrapper
+        return decorator
+
+
+def negative_cache(expire: float, exceptions: tuple = ()):
+    """Декоратор: запоминает пустой результат (None) функции на короткое
+    время, чтобы не повторять заведомо безрезультатные запросы к API.
+
+    Args:
+        expire: Время жизни записи в секундах.
+        exceptions: Исключения, которые тоже считаются пустым результатом:
+            они запоминаются и повторно выбрасываются без запроса к API.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            cached = NEG_CACHE.get(key)
+            if cached is not None:
+                expires_at, error = cached
+                if time.time() < expires_at:
+                    if error is not None:
+                        raise error.with_traceback(None)
+                    return None
+                NEG_CACHE.pop(key, None)
+            try:
+                value = func(*args, **kwargs)
+            except exceptions as error:
+                NEG_CACHE[key] = (time.time() + expire, error)
+                raise
+            if value is None:
+                NEG_CACHE[key] = (time.time() + expire, None)
+            return value
+        return wrapper
+    return decorator
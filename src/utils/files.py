@@ -0,0 +1,52 @@
+import os
+from contextlib import contextmanager, suppress
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', **kwargs):
+    """Контекстный менеджер для атомарной записи файла.
+
+    Данные пишутся во временный файл рядом с целевым, сбрасываются
+    на диск (fsync) и только затем файл переименовывается через
+    os.replace. При сбое, в том числе при отключении питания, на месте
+    целевого файла не остается пустого или недописанного файла.
+    Чтобы само переименование пережило сбой, каталог нужно
+    синхронизировать через fsync_dirs.
+
+    Args:
+        path: Путь к целевому файлу.
+        mode: Режим открытия файла ('w' или 'wb').
+        kwargs: Дополнительные аргументы для open.
+    """
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def fsync_dirs(directories):
+    """Сбрасывает на диск записи каталогов (переименования файлов).
+
+    На системах, где каталог нельзя открыть (Windows), ничего не делает.
+
+    Args:
+        directories: Пути к каталогам.
+    """
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -0,0 +1,83 @@
+import threading
+import time
+from functools import wraps
+
+
+class TokenBucket:
+    """Потокобезопасный token bucket для упреждающего ограничения запросов.
+
+    Args:
+        capacity: Максимальное количество токенов в корзине.
+        rate: Скорость пополнения, токенов в секунду.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """Забирает токены из корзины, при нехватке ждет пополнения.
+
+        Токены резервируются под блокировкой, а ожидание происходит вне её,
+        поэтому одновременные вызовы выстраиваются в очередь по времени.
+
+        Args:
+            tokens: Количество забираемых токенов.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            deficit = -self._tokens
+            delay = max(deficit / self.rate if deficit > 0 else 0.0,
+                        self._blocked_until - now)
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Запрещает выдачу токенов на указанное время (например, по
+        заголовку Retry-After).
+
+        Args:
+            seconds: Длительность паузы в секундах.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until,
+                                      time.monotonic() + seconds)
+
+
+def rate_limited(*buckets: TokenBucket):
+    """Декоратор: перед каждым вызовом функции забирает по токену
+    из каждой переданной корзины.
+
+    Args:
+        buckets: Корзины, ограничивающие частоту вызовов.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for bucket in buckets:
+                bucket.acquire(1)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_retry_after(value: str | None, default: float = 1.0) -> float:
+    """Возвращает паузу в секундах из заголовка Retry-After.
+
+    Args:
+        value: Значение заголовка.
+        default: Пауза, если заголовок отсутствует или не является числом.
+    """
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
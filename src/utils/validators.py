@@ -1,9 +1,14 @@
+import inspect
+import types
+import typing
+from functools import wraps
 from http import HTTPStatus
+
 from src.utils.exceptions import (
-    UnauthorisedError,
+    APIConnectionError,
     RequestLimitExceededError,
     TooManyRequestsError,
-    APIConnectionError
+    UnauthorisedError,
 )
 
 
@@ -20,6 +25,65 @@ def validate_types(**kwargs):
             )
 
 
+def _runtime_type(annotation) -> type | tuple | None:
+    """Преобразует аннотацию в аргумент для isinstance.
+
+    Возвращает None, если аннотацию проверить нельзя.
+    """
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        expected = []
+        for arg in typing.get_args(annotation):
+            arg_type = _runtime_type(arg)
+            if arg_type is None:
+                return None
+            expected.extend(
+                arg_type if isinstance(arg_type, tuple) else (arg_type,))
+        return tuple(expected)
+    if origin is not None:
+        annotation = origin
+    if isinstance(annotation, type):
+        return annotation
+    return None
+
+
+def typecheck(func):
+    """Декоратор: проверяет типы аргументов по аннотациям функции.
+
+    Список проверок строится один раз при декорировании.
+    При запуске с python -O проверки отключаются полностью.
+    """
+    if not __debug__:
+        return func
+    checks = []
+    for idx, (name, param) in enumerate(
+            inspect.signature(func).parameters.items()):
+        expected = _runtime_type(param.annotation)
+        if expected is not None:
+            checks.append((idx, name, expected))
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for idx, name, expected in checks:
+            if idx < len(args):
+                value = args[idx]
+            elif name in kwargs:
+                value = kwargs[name]
+            else:
+                continue
+            if not isinstance(value, expected):
+                expected_names = ' | '.join(
+                    t.__name__ for t in (
+                        expected if isinstance(expected, tuple)
+                        else (expected,)))
+                raise TypeError(
+                    f'Для {name} ожидался {expected_names}, '
+                    f'Получен {type(value).__name__}'
+                )
+        return func(*args, **kwargs)
+    return wrapper
+
+
 def check_request_status(status_code: int):
     """Проверяет статус ответа API.
 